@@ -0,0 +1,173 @@
+"""Shared pytest setup for the Warbler test suite."""
+
+import os
+from contextlib import closing
+
+import psycopg2
+import pytest
+from psycopg2 import sql
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+# Tables are built once in the template database; each test process
+# then gets its own database cloned from it. Under pytest-xdist, every
+# worker ("gw0", "gw1", ...) uses a database named after itself.
+TEMPLATE_DB = "warbler-test-template"
+WORKER = os.environ.get('PYTEST_XDIST_WORKER')
+TEST_DB = f"warbler-test-{WORKER}" if WORKER else "warbler-test"
+
+# BEFORE we import our app, let's set environmental variables for the
+# test run (the app reads them, and connects to the database, as soon
+# as it's imported).
+
+# Use a different database for tests.
+os.environ['DATABASE_URL'] = f"postgresql:///{TEST_DB}"
+
+# Plenty of pooled connections, so tests never wait on a checkout.
+os.environ.setdefault('DB_POOL_SIZE', '20')
+os.environ.setdefault('DB_MAX_OVERFLOW', '10')
+
+# Now we can import app
+
+from app import app
+from models import db, bcrypt
+
+# Don't have WTForms use CSRF at all, since it's a pain to test
+
+app.config['WTF_CSRF_ENABLED'] = False
+
+# Cheapest bcrypt cost; Flask-Bcrypt only reads it in init_app.
+
+app.config['BCRYPT_LOG_ROUNDS'] = 4
+bcrypt.init_app(app)
+
+
+@event.listens_for(Engine, "connect")
+def relax_durability(dbapi_connection, connection_record):
+    """Don't make test commits wait for the WAL to hit disk.
+
+    Losing the last few test transactions in a crash doesn't matter; see
+    postgresql.test.conf for the server-side settings.
+    """
+
+    autocommit = dbapi_connection.autocommit
+    dbapi_connection.autocommit = True
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET synchronous_commit TO OFF")
+    cursor.execute("SET client_min_messages TO WARNING")
+    cursor.close()
+
+    dbapi_connection.autocommit = autocommit
+
+
+def pytest_configure(config):
+    """Register our custom markers."""
+
+    config.addinivalue_line(
+        "markers",
+        "real_bcrypt: hash passwords for real (for tests that check them)",
+    )
+
+
+def pytest_sessionstart(session):
+    """Build the template database once, before any xdist workers start."""
+
+    if not hasattr(session.config, "workerinput"):
+        build_template()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Drop the template database once every worker is done with it."""
+
+    if not hasattr(session.config, "workerinput"):
+        drop_database(TEMPLATE_DB)
+
+
+def maintenance_connection():
+    """Connect to the `postgres` database to create and drop databases.
+
+    CREATE/DROP DATABASE can't run inside a transaction, so this is an
+    autocommit connection of its own, outside SQLAlchemy's pool.
+    """
+
+    conn = psycopg2.connect(dbname="postgres")
+    conn.autocommit = True
+    return conn
+
+
+def drop_database(name):
+    """Drop the database `name`, if it exists.
+
+    WITH (FORCE) closes any connections still open to it (say, from a
+    test that errored halfway through), so cleanup can't fail the run.
+    """
+
+    with closing(maintenance_connection()) as conn, conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)")
+                       .format(sql.Identifier(name)))
+
+
+def create_database(name, template=None):
+    """(Re)create the database `name`, optionally copied from `template`."""
+
+    create = sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name))
+    if template:
+        create += sql.SQL(" TEMPLATE {}").format(sql.Identifier(template))
+
+    drop_database(name)
+
+    with closing(maintenance_connection()) as conn, conn.cursor() as cursor:
+        cursor.execute(create)
+
+
+def build_template():
+    """Create the template database and our tables in it."""
+
+    create_database(TEMPLATE_DB)
+
+    engine = create_engine(f"postgresql:///{TEMPLATE_DB}")
+    db.metadata.create_all(engine)
+
+    # Postgres won't copy a template that still has connections open.
+    engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Give this test process a fresh, empty copy of our tables.
+
+    Postgres clones the template with a file copy rather than running
+    the DDL again. Each test rolls back its own data (see
+    testing.DBTestCase), so the copy is only made once per process.
+    The copy is dropped again when the run is over.
+    """
+
+    create_database(TEST_DB, template=TEMPLATE_DB)
+    yield
+
+    # Close the app's pooled connections before dropping the database.
+    with app.app_context():
+        db.engine.dispose()
+
+    drop_database(TEST_DB)
+
+
+@pytest.fixture(scope="class", autouse=True)
+def fast_password_hashing(request):
+    """Store passwords unhashed, unless the test class is marked real_bcrypt.
+
+    Class-scoped so it's already in place for users signed up in
+    setUpClass. Only tests that check passwords (User.authenticate) need
+    real hashes.
+    """
+
+    if request.node.get_closest_marker("real_bcrypt"):
+        yield
+        return
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(bcrypt, "generate_password_hash",
+                   lambda password, rounds=None, prefix=None:
+                   password.encode("utf-8"))
+        yield
@@ -136,7 +136,8 @@ class User(db.Model):
     def signup(cls, username, email, password, image_url):
         """Sign up user.
 
-        Hashes password and adds user to system.
+        Hashes password and adds user to the session; the caller commits,
+        so a signup can share a transaction with other changes.
         """
 
         hashed_pwd = bcrypt.generate_password_hash(password).decode('UTF-8')
@@ -190,7 +191,7 @@ class Message(db.Model):
     timestamp = db.Column(
         db.DateTime,
         nullable=False,
-        default=datetime.utcnow(),
+        default=datetime.utcnow,
     )
 
     user_id = db.Column(
@@ -214,3 +215,4 @@ def connect_db(app):
 
     db.app = app
     db.init_app(app)
+    bcrypt.init_app(app)
@@ -2,63 +2,40 @@
 
 # run these tests like:
 #
-#    python -m unittest test_message_model.py
+#    python -m pytest test_message_model.py
 
 
-import os
-from unittest import TestCase
 from datetime import datetime
 
-from models import db, User, Message, Follows
+from sqlalchemy import func, select
 
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app since that will have already
-# connected to the database)
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
+from models import db, User, Message, Follows
+from testing import DBTestCase
 
-# Now we can import app
-from app import app
 
-with app.app_context():
-    db.drop_all()
-    db.create_all()
-class MessageModelTestCase(TestCase):
+class MessageModelTestCase(DBTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-        self.app_context = app.app_context()
-        self.app_context.push()
+    @classmethod
+    def setUpClass(cls):
+        """Add sample data shared by every test."""
+        super().setUpClass()
 
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-        
-        db.session.commit()
-        
         # Create sample user
         user = User.signup(username="testuser2",
                            email="test2@test.com",
                            password="testpassword",
                            image_url=None)
 
-        db.session.add(user)
         db.session.commit()
 
-        self.user_id = user.id
-
-    def tearDown(self):
-        """Clean up any fouled transactions."""
-        db.session.rollback()
-        self.app_context.pop()
+        cls.user_id = user.id
 
     def test_message_model(self):
         """Does basic model work?"""
         # Create a message
         message = Message(
             text="Test message",
-            timestamp=datetime.utcnow(),
             user_id=self.user_id
         )
 
@@ -66,7 +43,7 @@ class MessageModelTestCase(TestCase):
         db.session.commit()
 
         # Check that the message was created successfully
-        self.assertEqual(len(Message.query.all()), 1)
+        self.assertEqual(db.session.scalar(select(func.count(Message.id))), 1)
         self.assertEqual(message.text, "Test message")
         self.assertEqual(message.timestamp.date(), datetime.utcnow().date())
         self.assertEqual(message.user_id, self.user_id)
@@ -89,21 +66,21 @@ class MessageModelTestCase(TestCase):
                     password="testpassword3",
                     image_url=None)
 
-        db.session.add_all([user1, user2, user3])
-        db.session.commit()
+        # flush (not commit) so the users get ids for their messages
+        db.session.flush()
 
         # Create messages for users
-        message1 = Message(text="Message 1", timestamp=datetime.utcnow(), user_id=user1.id)
-        message2 = Message(text="Message 2", timestamp=datetime.utcnow(), user_id=user2.id)
-        message3 = Message(text="Message 3", timestamp=datetime.utcnow(), user_id=user1.id)
-        message4 = Message(text="Message 4", timestamp=datetime.utcnow(), user_id=user3.id)
-
-        db.session.add_all([message1, message2, message3, message4])
-        db.session.commit()
+        db.session.execute(Message.__table__.insert(), [
+            {"text": "Message 1", "user_id": user1.id},
+            {"text": "Message 2", "user_id": user2.id},
+            {"text": "Message 3", "user_id": user1.id},
+            {"text": "Message 4", "user_id": user3.id},
+        ])
 
         # User1 follows User2
-        follow = Follows(user_being_followed_id=user2.id, user_following_id=user1.id)
-        db.session.add(follow)
+        db.session.execute(Follows.__table__.insert(), [
+            {"user_being_followed_id": user2.id, "user_following_id": user1.id},
+        ])
         db.session.commit()
 
         # Retrieve top messages for User1 (including their own messages and messages from User2)
@@ -111,6 +88,5 @@ class MessageModelTestCase(TestCase):
 
         # Check that the correct messages are returned
         self.assertEqual(len(top_messages), 3)
-        self.assertIn(message1, top_messages)
-        self.assertIn(message2, top_messages)
-        self.assertIn(message3, top_messages)
+        self.assertEqual({m.text for m in top_messages},
+                         {"Message 1", "Message 2", "Message 3"})
@@ -2,70 +2,47 @@
 
 # run these tests like:
 #
-#    python -m unittest test_user_model.py
+#    python -m pytest test_user_model.py
 
 
-import os
-from unittest import TestCase
+import pytest
 from sqlalchemy import exc
-from models import db, User, Message, Follows
-
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-
-# Now we can import app
-
 from app import app
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-with app.app_context():
-    db.drop_all()
-    db.create_all()
+from models import db, User, Message, Follows
+from testing import DBTestCase
 
 
-class UserModelTestCase(TestCase):
+@pytest.mark.real_bcrypt
+class UserModelTestCase(DBTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-        
-        self.app_context = app.app_context()
-        self.app_context.push()
+    @classmethod
+    def setUpClass(cls):
+        """Add sample data shared by every test."""
+        super().setUpClass()
 
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-        db.session.commit()
-        
         u1 = User.signup("testuser", "test@test.com", "password", None)
         u2 = User.signup("testuser2", "test2@test.com", "password", None)
-        
-        db.session.add(u1)
-        db.session.add(u2)
-        db.session.commit()
+
+        # flush (not commit) so the users get ids for the follow
+        db.session.flush()
 
         f = Follows(user_being_followed_id=u2.id, user_following_id=u1.id)
 
         db.session.add(f)
         db.session.commit()
-        
-        self.u1 = u1
-        self.u2 = u2
+
+        cls.u1_id = u1.id
+        cls.u2_id = u2.id
+
+    def setUp(self):
+        """Create test client, load sample data."""
+        super().setUp()
+
+        self.u1 = db.session.get(User, self.u1_id)
+        self.u2 = db.session.get(User, self.u2_id)
         self.client = app.test_client()
 
-    def tearDown(self):
-        """ Clean up any fouled transactions and pop app context."""
-        
-        db.session.rollback()
-        self.app_context.pop()
-        
     def test_user_model(self):
         """Does basic model work?"""
         # User should have no messages & no followers
@@ -2,71 +2,37 @@
 
 # run these tests like:
 #
-#    FLASK_ENV=production python -m unittest test_message_views.py
+#    FLASK_ENV=production python -m pytest test_user_views.py
 
 
-import os
-from unittest import TestCase
-
+from app import CURR_USER_KEY
 from models import db, connect_db, Message, User
-
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-
-# Now we can import app
-
-from app import app, CURR_USER_KEY
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-with app.app_context():
-    db.drop_all()
-    db.create_all()
-
-# Don't have WTForms use CSRF at all, since it's a pain to test
-
-app.config['WTF_CSRF_ENABLED'] = False
+from testing import DBTestCase
 
 
-class MessageViewTestCase(TestCase):
+class MessageViewTestCase(DBTestCase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-        self.app_context = app.app_context()
-        self.app_context.push()
-        
-        User.query.delete()
-        Message.query.delete()
+    @classmethod
+    def setUpClass(cls):
+        """Add sample data shared by every test."""
+        super().setUpClass()
 
-        self.client = app.test_client()
-
-        self.testuser = User.signup(username="testuser",
-                                    email="test@test.com",
-                                    password="testuser",
-                                    image_url=None)
+        testuser = User.signup(username="testuser",
+                               email="test@test.com",
+                               password="testuser",
+                               image_url=None)
 
         db.session.commit()
-        
-    def tearDown(self):
-        """Remove any fouled transaction."""
-        db.session.rollback()
-        self.app_context.pop()
-        
+
+        cls.testuser_id = testuser.id
+
     def test_add_message(self):
         """Can user add a message?"""
 
         with self.client as c:
             with c.session_transaction() as sess:
-                self.testuser = db.session.merge(self.testuser)
-                sess[CURR_USER_KEY] = self.testuser.id
+                sess[CURR_USER_KEY] = self.testuser_id
 
             resp = c.post("/messages/new", data={"text": "Hello"})
 
@@ -90,23 +56,23 @@ class MessageViewTestCase(TestCase):
 
         with self.client as c:
             with c.session_transaction() as sess:
-                self.testuser = db.session.merge(self.testuser)
-                sess[CURR_USER_KEY] = self.testuser.id
+                sess[CURR_USER_KEY] = self.testuser_id
 
             # Create a test message
-            message = Message(text="Test message", user_id=self.testuser.id)
+            message = Message(text="Test message", user_id=self.testuser_id)
             db.session.add(message)
             db.session.commit()
+            message_id = message.id
 
             # Send a DELETE request to delete the message
-            resp = c.post(f"/messages/{message.id}/delete")
+            resp = c.post(f"/messages/{message_id}/delete")
 
             # Expecting a 302 redirect to the user's page
             self.assertEqual(resp.status_code, 302)
-            self.assertEqual(resp.location, f"/users/{self.testuser.id}")
+            self.assertEqual(resp.location, f"/users/{self.testuser_id}")
             
             # Check that the message is deleted from the database
-            deleted_message = db.session.get(Message, message.id)
+            deleted_message = db.session.get(Message, message_id)
             self.assertIsNone(deleted_message)
 
     def test_delete_other_user_message(self):
@@ -114,27 +80,26 @@ class MessageViewTestCase(TestCase):
 
         # Create another user
         other_user = User.signup(username="otheruser", email="other@test.com", password="otheruser", image_url=None)
+
+        # Create a test message owned by the other user
+        message = Message(text="Test message", user=other_user)
+        db.session.add(message)
         db.session.commit()
+        message_id = message.id
 
         with self.client as c:
             with c.session_transaction() as sess:
-                self.testuser = db.session.merge(self.testuser)
-                sess[CURR_USER_KEY] = self.testuser.id
-
-            # Create a test message owned by the other user
-            message = Message(text="Test message", user_id=other_user.id)
-            db.session.add(message)
-            db.session.commit()
+                sess[CURR_USER_KEY] = self.testuser_id
 
             # Send a DELETE request to delete the message
-            resp = c.post(f"/messages/{message.id}/delete")
+            resp = c.post(f"/messages/{message_id}/delete")
 
             # Expecting a 401 Unauthorized status code
             self.assertEqual(resp.status_code, 302)
             self.assertEqual(resp.location, "/")
 
             # Check that the message is not deleted from the database
-            existing_message = db.session.get(Message, message.id)
+            existing_message = db.session.get(Message, message_id)
             self.assertIsNotNone(existing_message)
 
     def test_delete_message_unauthenticated(self):
@@ -142,26 +107,29 @@ class MessageViewTestCase(TestCase):
 
         with self.client as c:
             # Create a test message
-            message = Message(text="Test message", user_id=self.testuser.id)
+            message = Message(text="Test message", user_id=self.testuser_id)
             db.session.add(message)
             db.session.commit()
+            message_id = message.id
 
             # Send a DELETE request to delete the message
-            resp = c.post(f"/messages/{message.id}/delete")
+            resp = c.post(f"/messages/{message_id}/delete")
 
             # Expecting a 302 redirect to the login page
             self.assertEqual(resp.status_code, 302)
             self.assertEqual(resp.location, "/login")
 
+            # Check that the message is not deleted from the database
+            self.assertIsNotNone(db.session.get(Message, message_id))
+
     def test_view_followers_authenticated(self):
         """Can user view the followers page when authenticated?"""
 
         with self.client as c:
             with c.session_transaction() as sess:
-                self.testuser = db.session.merge(self.testuser)
-                sess[CURR_USER_KEY] = self.testuser.id
+                sess[CURR_USER_KEY] = self.testuser_id
 
-            resp = c.get(f"/users/{self.testuser.id}/followers")
+            resp = c.get(f"/users/{self.testuser_id}/followers")
 
             # Expecting a 200 OK response
             self.assertEqual(resp.status_code, 200)
@@ -171,7 +139,7 @@ class MessageViewTestCase(TestCase):
         """Is user prohibited from viewing the followers page when not authenticated?"""
 
         with self.client as c:
-            resp = c.get(f"/users/{self.testuser.id}/followers")
+            resp = c.get(f"/users/{self.testuser_id}/followers")
 
             # Expecting a 302 redirect to the login page
             self.assertEqual(resp.status_code, 302)
@@ -182,10 +150,9 @@ class MessageViewTestCase(TestCase):
 
         with self.client as c:
             with c.session_transaction() as sess:
-                self.testuser = db.session.merge(self.testuser)
-                sess[CURR_USER_KEY] = self.testuser.id
+                sess[CURR_USER_KEY] = self.testuser_id
 
-            resp = c.get(f"/users/{self.testuser.id}/following")
+            resp = c.get(f"/users/{self.testuser_id}/following")
 
             # Expecting a 200 OK response
             self.assertEqual(resp.status_code, 200)
@@ -195,7 +162,7 @@ class MessageViewTestCase(TestCase):
         """Is user prohibited from viewing the following page when not authenticated?"""
 
         with self.client as c:
-            resp = c.get(f"/users/{self.testuser.id}/following")
+            resp = c.get(f"/users/{self.testuser_id}/following")
 
             # Expecting a 302 redirect to the login page
             self.assertEqual(resp.status_code, 302)
@@ -0,0 +1,85 @@
+"""Base test case for tests that use the Warbler database."""
+
+from unittest import TestCase
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app import app
+from models import db
+
+
+def check_test_database():
+    """Make sure the app is pointed at a warbler-test database.
+
+    conftest.py sets DATABASE_URL; running these tests any other way
+    (e.g. `python -m unittest`) would leave the app on the development
+    database, which the tests write to and then truncate.
+    """
+
+    database = make_url(app.config['SQLALCHEMY_DATABASE_URI']).database
+
+    if not (database or "").startswith("warbler-test"):
+        raise RuntimeError(
+            f"Refusing to run tests against database {database!r}; "
+            "run them with pytest so conftest.py can set up a test database.")
+
+
+class DBTestCase(TestCase):
+    """Test case with an app context pushed for the whole class.
+
+    Tables are created once per run (see conftest.py). Subclasses can
+    commit shared sample data in `setUpClass`; it's deleted again in
+    `tearDownClass`. Each test runs inside a transaction that is rolled
+    back afterwards, so nothing a test writes (even through
+    `db.session.commit()`) outlives it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Push an app context for every test in this class."""
+
+        check_test_database()
+
+        cls.app_context = app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Delete this class's sample data and pop the app context."""
+
+        db.session.execute(text(
+            "TRUNCATE users, messages, follows RESTART IDENTITY CASCADE"))
+        db.session.commit()
+
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Make a test client and bind db.session to a throwaway transaction."""
+
+        # A new client each time, so a login (session cookie) from one
+        # test can't carry over into the next.
+        self.client = app.test_client()
+
+        self.connection = db.engine.connect()
+        self.trans = self.connection.begin()
+
+        # Commits from tests and views release a SAVEPOINT instead of
+        # committing the outer transaction. db.Query keeps the
+        # Flask-SQLAlchemy helpers (get_or_404 etc.) the views rely on.
+        self.app_session = db.session
+        db.session = scoped_session(sessionmaker(
+            bind=self.connection,
+            join_transaction_mode="create_savepoint",
+            query_cls=db.Query,
+        ))
+
+    def tearDown(self):
+        """Roll back everything this test did."""
+
+        db.session.remove()
+        db.session = self.app_session
+
+        self.trans.rollback()
+        self.connection.close()